@@ -2,244 +2,378 @@
 
 import os
 import json
+import operator
+import re
 import sys
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _walk_relative(root):
+    stack = ['']
+    while stack:
+        rel = stack.pop()
+        with os.scandir(os.path.join(root, rel) if rel else root) as entries:
+            for entry in entries:
+                rel_path = f"{rel}/{entry.name}" if rel else entry.name
+                yield rel_path
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(rel_path)
+
+_HTML_SIG = re.compile(rb'<!DOCTYPE html>.*<html', re.DOTALL | re.IGNORECASE)
+_DEMO_SIG = re.compile(rb'<!DOCTYPE html>.*STEDemo', re.DOTALL | re.IGNORECASE)
+
+def _is_valid_html(content):
+    return _HTML_SIG.search(content) is not None
+
+def _demo_is_valid(content):
+    return content is not None and _DEMO_SIG.search(content) is not None
+
+def _icons_exist(tester):
+    return {'icons/icon16.png', 'icons/icon32.png', 'icons/icon48.png',
+            'icons/icon128.png'}.issubset(tester.snapshot.paths)
+
+def _fail():
+    return False
+
+def _manifest_is_valid(manifest):
+    return isinstance(manifest, dict)
+
+def _manifest_has_required_fields(manifest):
+    return manifest.get('name') and manifest.get('version') and manifest.get('manifest_version') == 3
+
+def _manifest_has_service_worker(manifest):
+    return manifest.get('background', {}).get('service_worker')
+
+def _manifest_has_content_scripts(manifest):
+    return manifest.get('content_scripts') and len(manifest.get('content_scripts', [])) > 0
+
+def _manifest_has_required_permissions(manifest):
+    return {'activeTab', 'tabs', 'storage', 'system.cpu',
+            'system.memory'}.issubset(manifest.get('permissions', ()))
+
+def _references_service_worker(tester, manifest):
+    return tester.file_exists(manifest['background']['service_worker'])
+
+def _references_content_scripts(tester, manifest):
+    return set(manifest['content_scripts'][0]['js']).issubset(tester.snapshot.paths)
+
+def _references_popup(tester, manifest):
+    return tester.file_exists(manifest['action']['default_popup'])
+
+def _references_web_accessible(tester, manifest):
+    return set(manifest['web_accessible_resources'][0]['resources']).issubset(tester.snapshot.paths)
+
+MANIFEST_CHECKS = (
+    ('manifest.json is valid JSON', _manifest_is_valid),
+    ('manifest has required fields', _manifest_has_required_fields),
+    ('manifest has background service worker', _manifest_has_service_worker),
+    ('manifest has content scripts', _manifest_has_content_scripts),
+    ('manifest has required permissions', _manifest_has_required_permissions),
+)
+
+REFERENCE_CHECKS = (
+    ('all background scripts exist', _references_service_worker),
+    ('all content scripts exist', _references_content_scripts),
+    ('popup HTML exists', _references_popup),
+    ('web accessible resources exist', _references_web_accessible),
+)
+
+SOURCE_SECTIONS = (
+    ('\n🔧 Testing background scripts...', (
+        ('background/service-worker.js', 'service-worker.js exists',
+         (('service-worker.js has main class', b'class SecureTestingService'),)),
+        ('background/system-monitor.js', 'system-monitor.js exists',
+         (('system-monitor.js has monitoring class', b'class SystemMonitor'),)),
+        ('background/config-manager.js', 'config-manager.js exists',
+         (('config-manager.js has config class', b'class ConfigManager'),)),
+    )),
+    ('\n📄 Testing content scripts...', (
+        ('content/security-enforcer.js', 'security-enforcer.js exists',
+         (('security-enforcer.js has main class', b'class SecurityEnforcer'),)),
+        ('content/keyboard-tracker.js', 'keyboard-tracker.js exists',
+         (('keyboard-tracker.js has tracking class', b'class KeyboardTracker'),)),
+        ('content/page-monitor.js', 'page-monitor.js exists',
+         (('page-monitor.js has monitoring class', b'class PageMonitor'),)),
+    )),
+    ('\n🖼️  Testing popup interface...', (
+        ('popup/popup.html', 'popup.html exists',
+         (('popup.html is valid HTML', _is_valid_html),)),
+        ('popup/popup.css', 'popup.css exists', ()),
+        ('popup/popup.js', 'popup.js exists',
+         (('popup.js has controller class', b'class PopupController'),)),
+    )),
+    ('\n⚙️  Testing admin interface...', (
+        ('admin/admin.html', 'admin.html exists',
+         (('admin.html is valid HTML', _is_valid_html),)),
+        ('admin/admin.css', 'admin.css exists', ()),
+        ('admin/admin.js', 'admin.js exists',
+         (('admin.js has panel class', b'class AdminPanel'),)),
+    )),
+    ('\n🔌 Testing integration API...', (
+        ('api/integration-api.js', 'integration-api.js exists',
+         (('integration-api.js has main API class', b'class SecureTestingEnvironmentAPI'),
+          ('integration-api.js exposes global API', b'window.SecureTestingEnvironment'))),
+    )),
+    ('\n🛠️  Testing utilities...', (
+        ('utils/logger.js', 'logger.js exists',
+         (('logger.js has Logger class', b'class Logger'),)),
+        ('utils/api-client.js', 'api-client.js exists',
+         (('api-client.js has APIClient class', b'class APIClient'),)),
+    )),
+)
+
+def _iter_descriptions():
+    yield 'manifest.json exists'
+    for desc, _ in MANIFEST_CHECKS:
+        yield desc
+    for _, checks in SOURCE_SECTIONS:
+        for _, exists_desc, content_checks in checks:
+            yield exists_desc
+            for desc, _ in content_checks:
+                yield desc
+    for desc, _ in REFERENCE_CHECKS:
+        yield desc
+    yield 'manifest file references are resolvable'
+    yield 'demo page exists'
+    yield 'demo page is valid HTML'
+
+_RESULT_LINES = {desc: (f"✅ {desc}", f"❌ {desc}") for desc in _iter_descriptions()}
+
+class ExtensionSnapshot:
+    """In-memory view of the extension tree, loaded once and shared by
+    every analysis that runs against the same checkout."""
+
+    def __init__(self, extension_path):
+        self.extension_path = Path(extension_path)
+        self.paths = frozenset(
+            _walk_relative(self.extension_path)
+        ) if self.extension_path.is_dir() else frozenset()
+        self.file_cache = {}
+        self.json_cache = {}
+        self._dirfd = None
+        if self.paths and os.open in os.supports_dir_fd:
+            self._dirfd = os.open(
+                self.extension_path,
+                os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0),
+            )
+
+    def close(self):
+        if self._dirfd is not None:
+            os.close(self._dirfd)
+            self._dirfd = None
+
+    def __del__(self):
+        self.close()
+
+    def read_bytes(self, file_path):
+        if file_path not in self.file_cache:
+            if file_path not in self.paths:
+                raise FileNotFoundError(f"File not found: {file_path}")
+            self.file_cache[file_path] = self._read_relative(file_path)
+        return self.file_cache[file_path]
+
+    def _read_relative(self, file_path):
+        if self._dirfd is None:
+            return (self.extension_path / file_path).read_bytes()
+        # openat(2) resolves relative to the cached directory fd, skipping
+        # the per-component pathwalk from / on every read.
+        fd = os.open(file_path, os.O_RDONLY, dir_fd=self._dirfd)
+        try:
+            size = os.fstat(fd).st_size
+            data = os.read(fd, size) if size else b''
+            while len(data) < size:
+                chunk = os.read(fd, size - len(data))
+                if not chunk:
+                    break
+                data += chunk
+        finally:
+            os.close(fd)
+        return data
+
+    def read_json(self, file_path):
+        if file_path not in self.json_cache:
+            loads = json.loads if orjson is None else orjson.loads
+            self.json_cache[file_path] = loads(self.read_bytes(file_path))
+        return self.json_cache[file_path]
+
+    def try_read(self, file_path):
+        try:
+            return self.read_bytes(file_path)
+        except OSError:
+            return None
+
 class ExtensionTester:
-    def __init__(self):
-        self.extension_path = Path(__file__).parent / 'extension'
+    def __init__(self, snapshot=None):
+        self.snapshot = snapshot or ExtensionSnapshot(Path(__file__).parent / 'extension')
         self.errors = []
         self.warnings = []
         self.passed = 0
         self.total = 0
+        self._out = []
+
+    def _emit(self, line):
+        self._out.append(line)
+
+    def _flush_output(self):
+        if not self._out:
+            return
+        sys.stdout.write('\n'.join(self._out) + '\n')
+        sys.stdout.flush()
+        self._out.clear()
 
     def test(self, description, test_fn):
         self.total += 1
+        lines = _RESULT_LINES.get(description)
+        if lines is None:
+            lines = (f"✅ {description}", f"❌ {description}")
         try:
             result = test_fn()
             if result:
-                print(f"✅ {description}")
+                self._emit(lines[0])
                 self.passed += 1
             else:
-                print(f"❌ {description}")
+                self._emit(lines[1])
                 self.errors.append(description)
         except Exception as error:
-            print(f"❌ {description} - {str(error)}")
+            self._emit(f"❌ {description} - {str(error)}")
             self.errors.append(f"{description}: {str(error)}")
 
     def warn(self, description, test_fn):
         try:
             result = test_fn()
             if not result:
-                print(f"⚠️  {description}")
+                self._emit(f"⚠️  {description}")
                 self.warnings.append(description)
         except Exception as error:
-            print(f"⚠️  {description} - {str(error)}")
+            self._emit(f"⚠️  {description} - {str(error)}")
             self.warnings.append(f"{description}: {str(error)}")
 
     def file_exists(self, file_path):
-        return (self.extension_path / file_path).exists()
+        return file_path in self.snapshot.paths
 
     def read_json_file(self, file_path):
-        full_path = self.extension_path / file_path
-        if not full_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-        with open(full_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-
-    def read_file(self, file_path):
-        full_path = self.extension_path / file_path
-        if not full_path.exists():
-            raise FileNotFoundError(f"File not found: {file_path}")
-        with open(full_path, 'r', encoding='utf-8') as f:
-            return f.read()
+        return self.snapshot.read_json(file_path)
+
+    def read_bytes_cached(self, file_path):
+        return self.snapshot.read_bytes(file_path)
+
+    def _safe_load_manifest(self):
+        try:
+            return self.snapshot.read_json('manifest.json')
+        except Exception:
+            return None
+
+    def run_source_checks(self, checks, pool):
+        paths = [path for path, _, _ in checks]
+        contents = dict(zip(paths, pool.map(self.snapshot.try_read, paths)))
+        found = {path: self._scan_needles(contents[path], content_checks)
+                 for path, _, content_checks in checks}
+        for path, exists_desc, _ in checks:
+            self.test(exists_desc, partial(operator.is_not, contents[path], None))
+        for path, _, content_checks in checks:
+            for desc, check in content_checks:
+                if callable(check):
+                    self.test(desc, partial(check, contents[path] or b''))
+                else:
+                    self.test(desc, partial(operator.contains, found[path], check))
+
+    @staticmethod
+    def _scan_needles(content, content_checks):
+        needles = [check for _, check in content_checks if not callable(check)]
+        if not needles or content is None:
+            return set()
+        pattern = re.compile(b'|'.join(map(re.escape, needles)))
+        return {match.group() for match in pattern.finditer(content)}
 
     def run_tests(self):
-        print('🧪 Testing Secure Testing Environment Extension\n')
+        # Flush whatever was buffered even if a check escapes the per-test
+        # boundary, so a crash still shows the results gathered so far.
+        try:
+            return self._run_tests()
+        finally:
+            self._flush_output()
+
+    def _run_tests(self):
+        self._emit('🧪 Testing Secure Testing Environment Extension\n')
 
         # Test manifest.json
-        print('📋 Testing manifest.json...')
-        self.test('manifest.json exists', lambda: self.file_exists('manifest.json'))
-        
-        self.test('manifest.json is valid JSON', lambda: (
-            isinstance(self.read_json_file('manifest.json'), dict)
-        ))
-
-        self.test('manifest has required fields', lambda: (
-            lambda manifest: manifest.get('name') and manifest.get('version') and manifest.get('manifest_version') == 3
-        )(self.read_json_file('manifest.json')))
-
-        self.test('manifest has background service worker', lambda: (
-            lambda manifest: manifest.get('background', {}).get('service_worker')
-        )(self.read_json_file('manifest.json')))
-
-        self.test('manifest has content scripts', lambda: (
-            lambda manifest: manifest.get('content_scripts') and len(manifest.get('content_scripts', [])) > 0
-        )(self.read_json_file('manifest.json')))
-
-        self.test('manifest has required permissions', lambda: (
-            lambda manifest: all(perm in manifest.get('permissions', []) 
-                                for perm in ['activeTab', 'tabs', 'storage', 'system.cpu', 'system.memory'])
-        )(self.read_json_file('manifest.json')))
-
-        # Test background scripts
-        print('\n🔧 Testing background scripts...')
-        self.test('service-worker.js exists', lambda: self.file_exists('background/service-worker.js'))
-        self.test('system-monitor.js exists', lambda: self.file_exists('background/system-monitor.js'))
-        self.test('config-manager.js exists', lambda: self.file_exists('background/config-manager.js'))
-
-        self.test('service-worker.js has main class', lambda: (
-            'class SecureTestingService' in self.read_file('background/service-worker.js')
-        ))
-
-        self.test('system-monitor.js has monitoring class', lambda: (
-            'class SystemMonitor' in self.read_file('background/system-monitor.js')
-        ))
-
-        self.test('config-manager.js has config class', lambda: (
-            'class ConfigManager' in self.read_file('background/config-manager.js')
-        ))
-
-        # Test content scripts
-        print('\n📄 Testing content scripts...')
-        self.test('security-enforcer.js exists', lambda: self.file_exists('content/security-enforcer.js'))
-        self.test('keyboard-tracker.js exists', lambda: self.file_exists('content/keyboard-tracker.js'))
-        self.test('page-monitor.js exists', lambda: self.file_exists('content/page-monitor.js'))
-
-        self.test('security-enforcer.js has main class', lambda: (
-            'class SecurityEnforcer' in self.read_file('content/security-enforcer.js')
-        ))
-
-        self.test('keyboard-tracker.js has tracking class', lambda: (
-            'class KeyboardTracker' in self.read_file('content/keyboard-tracker.js')
-        ))
-
-        self.test('page-monitor.js has monitoring class', lambda: (
-            'class PageMonitor' in self.read_file('content/page-monitor.js')
-        ))
-
-        # Test popup interface
-        print('\n🖼️  Testing popup interface...')
-        self.test('popup.html exists', lambda: self.file_exists('popup/popup.html'))
-        self.test('popup.css exists', lambda: self.file_exists('popup/popup.css'))
-        self.test('popup.js exists', lambda: self.file_exists('popup/popup.js'))
-
-        self.test('popup.html is valid HTML', lambda: (
-            lambda content: '<!DOCTYPE html>' in content and '<html' in content
-        )(self.read_file('popup/popup.html')))
-
-        self.test('popup.js has controller class', lambda: (
-            'class PopupController' in self.read_file('popup/popup.js')
-        ))
-
-        # Test admin interface
-        print('\n⚙️  Testing admin interface...')
-        self.test('admin.html exists', lambda: self.file_exists('admin/admin.html'))
-        self.test('admin.css exists', lambda: self.file_exists('admin/admin.css'))
-        self.test('admin.js exists', lambda: self.file_exists('admin/admin.js'))
-
-        self.test('admin.html is valid HTML', lambda: (
-            lambda content: '<!DOCTYPE html>' in content and '<html' in content
-        )(self.read_file('admin/admin.html')))
-
-        self.test('admin.js has panel class', lambda: (
-            'class AdminPanel' in self.read_file('admin/admin.js')
-        ))
-
-        # Test integration API
-        print('\n🔌 Testing integration API...')
-        self.test('integration-api.js exists', lambda: self.file_exists('api/integration-api.js'))
-
-        self.test('integration-api.js has main API class', lambda: (
-            'class SecureTestingEnvironmentAPI' in self.read_file('api/integration-api.js')
-        ))
-
-        self.test('integration-api.js exposes global API', lambda: (
-            'window.SecureTestingEnvironment' in self.read_file('api/integration-api.js')
-        ))
-
-        # Test utilities
-        print('\n🛠️  Testing utilities...')
-        self.test('logger.js exists', lambda: self.file_exists('utils/logger.js'))
-        self.test('api-client.js exists', lambda: self.file_exists('utils/api-client.js'))
-
-        self.test('logger.js has Logger class', lambda: (
-            'class Logger' in self.read_file('utils/logger.js')
-        ))
-
-        self.test('api-client.js has APIClient class', lambda: (
-            'class APIClient' in self.read_file('utils/api-client.js')
-        ))
+        self._emit('📋 Testing manifest.json...')
+        self.test('manifest.json exists', partial(self.file_exists, 'manifest.json'))
+
+        manifest = self._safe_load_manifest()
+        if manifest is None:
+            # The remaining manifest checks cannot pass; record one failure
+            # instead of raising (and building a traceback) per test.
+            self.test('manifest.json is valid JSON', _fail)
+        else:
+            for desc, check in MANIFEST_CHECKS:
+                self.test(desc, partial(check, manifest))
+
+        # Test extension source files, section by section, sharing one
+        # executor so the pool is set up once rather than per section
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            for header, checks in SOURCE_SECTIONS:
+                self._emit(header)
+                self.run_source_checks(checks, pool)
 
         # Test manifest references
-        print('\n🔗 Testing manifest file references...')
-        self.test('all background scripts exist', lambda: (
-            lambda manifest: self.file_exists(manifest['background']['service_worker'])
-        )(self.read_json_file('manifest.json')))
-
-        self.test('all content scripts exist', lambda: (
-            lambda manifest: all(self.file_exists(script) 
-                                for script in manifest['content_scripts'][0]['js'])
-        )(self.read_json_file('manifest.json')))
-
-        self.test('popup HTML exists', lambda: (
-            lambda manifest: self.file_exists(manifest['action']['default_popup'])
-        )(self.read_json_file('manifest.json')))
-
-        # Test web accessible resources
-        self.test('web accessible resources exist', lambda: (
-            lambda manifest: all(self.file_exists(resource) 
-                                for resource in manifest['web_accessible_resources'][0]['resources'])
-        )(self.read_json_file('manifest.json')))
+        self._emit('\n🔗 Testing manifest file references...')
+        if manifest is None:
+            self.test('manifest file references are resolvable', _fail)
+        else:
+            for desc, check in REFERENCE_CHECKS:
+                self.test(desc, partial(check, self, manifest))
 
         # Warnings for optional files
-        print('\n⚠️  Checking optional files...')
-        self.warn('Icon files should exist', lambda: (
-            self.file_exists('icons/icon16.png') and 
-            self.file_exists('icons/icon32.png') and 
-            self.file_exists('icons/icon48.png') and 
-            self.file_exists('icons/icon128.png')
-        ))
+        self._emit('\n⚠️  Checking optional files...')
+        self.warn('Icon files should exist', partial(_icons_exist, self))
 
         # Test demo page
-        print('\n🎯 Testing demo page...')
+        self._emit('\n🎯 Testing demo page...')
         demo_path = Path(__file__).parent / 'demo/index.html'
-        self.test('demo page exists', lambda: demo_path.exists())
+        try:
+            demo_content = demo_path.read_bytes()
+        except OSError:
+            demo_content = None
+        self.test('demo page exists', partial(operator.is_not, demo_content, None))
 
-        self.test('demo page is valid HTML', lambda: (
-            lambda: (demo_path.exists() and 
-                    '<!DOCTYPE html>' in demo_path.read_text(encoding='utf-8') and 
-                    'STEDemo' in demo_path.read_text(encoding='utf-8'))
-        )())
+        self.test('demo page is valid HTML', partial(_demo_is_valid, demo_content))
 
         # Summary
-        print('\n📊 Test Summary')
-        print('================')
-        print(f"✅ Passed: {self.passed}/{self.total}")
-        print(f"❌ Failed: {len(self.errors)}")
-        print(f"⚠️  Warnings: {len(self.warnings)}")
+        self._emit('\n📊 Test Summary')
+        self._emit('================')
+        self._emit(f"✅ Passed: {self.passed}/{self.total}")
+        self._emit(f"❌ Failed: {len(self.errors)}")
+        self._emit(f"⚠️  Warnings: {len(self.warnings)}")
 
         if self.errors:
-            print('\n❌ Errors:')
+            self._emit('\n❌ Errors:')
             for error in self.errors:
-                print(f"  - {error}")
+                self._emit(f"  - {error}")
 
         if self.warnings:
-            print('\n⚠️  Warnings:')
+            self._emit('\n⚠️  Warnings:')
             for warning in self.warnings:
-                print(f"  - {warning}")
+                self._emit(f"  - {warning}")
 
         success_rate = (self.passed / self.total * 100) if self.total > 0 else 0
-        print(f"\n🎯 Success Rate: {success_rate:.1f}%")
+        self._emit(f"\n🎯 Success Rate: {success_rate:.1f}%")
 
         if not self.errors:
-            print('\n🎉 All tests passed! Extension structure is valid.')
+            self._emit('\n🎉 All tests passed! Extension structure is valid.')
             return True
         else:
-            print('\n💥 Some tests failed. Please fix the errors above.')
+            self._emit('\n💥 Some tests failed. Please fix the errors above.')
             return False
 
 if __name__ == '__main__':
-    tester = ExtensionTester()
+    snapshot = ExtensionSnapshot(Path(__file__).parent / 'extension')
+    tester = ExtensionTester(snapshot)
     success = tester.run_tests()
-    sys.exit(0 if success else 1)
\ No newline at end of file
+    sys.exit(0 if success else 1)